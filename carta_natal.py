@@ -1,24 +1,65 @@
 import swisseph as swe
+import logging
 import os
+from copy import deepcopy
+from functools import lru_cache
 from pathlib import Path
 
+from transitos import asegurar_ephe_path
+
+logger = logging.getLogger(__name__)
+
 # Ruta de efemérides
 BASE_DIR = Path(__file__).resolve().parent
 EPHE_PATH = str(BASE_DIR / "ephe")
-swe.set_ephe_path(EPHE_PATH)
+
+SIGNOS = (
+    "ARIES","TAURO","GEMINIS","CANCER","LEO","VIRGO",
+    "LIBRA","ESCORPIO","SAGITARIO","CAPRICORNIO","ACUARIO","PISCIS"
+)
+
+PUNTO_NO_DISPONIBLE = {
+    'signo': 'N/A', 'grado': 0.0, 'casa': 0,
+    'retrogrado': False, 'longitud': 0.0
+}
+
+# Puntos que dependen de los ficheros de efemérides instalados
+# (Quirón necesita seas_18.se1). Se comprueban una vez en inicializar_swisseph.
+PUNTOS_OPCIONALES = (
+    ('NODO_NORTE', swe.TRUE_NODE),
+    ('LILITH', swe.OSCU_APOG),   # True Black Moon (osculante)
+    ('QUIRON', swe.CHIRON)
+)
+PUNTOS_DISPONIBLES = {}
+
+def inicializar_swisseph():
+    """
+    Fija la ruta de efemérides y detecta qué puntos opcionales se pueden calcular
+    (con la misma ruta que fija asegurar_ephe_path en los hilos de petición).
+    """
+    swe.set_ephe_path(EPHE_PATH)
+    jd_prueba = swe.julday(2000, 1, 1, 12.0)
+    for nombre, num in PUNTOS_OPCIONALES:
+        try:
+            swe.calc_ut(jd_prueba, num, swe.FLG_SWIEPH)
+            PUNTOS_DISPONIBLES[nombre] = True
+        except swe.Error as e:
+            logger.warning("%s no disponible: %s", nombre, e)
+            PUNTOS_DISPONIBLES[nombre] = False
+
+inicializar_swisseph()
 
 def obtener_signo_grado(longitud_ec):
-    signos = [
-        "ARIES","TAURO","GEMINIS","CANCER","LEO","VIRGO",
-        "LIBRA","ESCORPIO","SAGITARIO","CAPRICORNIO","ACUARIO","PISCIS"
-    ]
     signo_index = int(longitud_ec // 30) % 12
-    grado = (longitud_ec % 30)
-    return signos[signo_index], grado
+    return SIGNOS[signo_index], longitud_ec - signo_index * 30.0
 
 
-def calcular_carta_natal_sola(año, mes, dia, hora, minuto, latitud, longitud, zona_horaria, sistema_casas='P'):
-    swe.set_ephe_path(EPHE_PATH)
+def _calcular_carta(año, mes, dia, hora, minuto, latitud, longitud, zona_horaria, sistema_casas='P'):
+    """
+    Cálculo completo de la carta. Devuelve (carta, cuspides, cuspides_placidus),
+    donde cuspides son las del sistema pedido y cuspides_placidus las de swe.houses.
+    """
+    asegurar_ephe_path()
 
     # Ajustar hora local a UTC
     hora_utc = hora - zona_horaria
@@ -33,15 +74,11 @@ def calcular_carta_natal_sola(año, mes, dia, hora, minuto, latitud, longitud, z
     jd = swe.julday(año, mes, dia_utc, hora_utc + minuto/60.0)
 
     casas_data = swe.houses(jd, latitud, longitud, b'P')
-    cuspides_placidus = list(casas_data[0][:12])
+    cuspides_placidus = casas_data[0][:12]
     ascendente = casas_data[1][0]
     mc = casas_data[1][1]
     
-    # 🐛 DEBUG - Imprime valores de ASC y MC
-    print(f"\n🐛 DEBUG ASC: {ascendente:.4f}° = {obtener_signo_grado(ascendente)[0]} {obtener_signo_grado(ascendente)[1]:.2f}°")
-    print(f"🐛 DEBUG MC: {mc:.4f}° = {obtener_signo_grado(mc)[0]} {obtener_signo_grado(mc)[1]:.2f}°")
-    print(f"🐛 DEBUG Cúspide Casa 10: {cuspides_placidus[9]:.4f}° = {obtener_signo_grado(cuspides_placidus[9])[0]} {obtener_signo_grado(cuspides_placidus[9])[1]:.2f}°")
-    print(f"🐛 MC == Cúspide 10? {abs(mc - cuspides_placidus[9]) < 0.01}")
+    logger.debug("ASC: %.4f° | MC: %.4f° | Cúspide 10: %.4f°", ascendente, mc, cuspides_placidus[9])
     
     signo_ascendente = int(ascendente // 30) % 12
 
@@ -88,75 +125,49 @@ def calcular_carta_natal_sola(año, mes, dia, hora, minuto, latitud, longitud, z
     for nombre, num in planetas.items():
         res = swe.calc_ut(jd, num, swe.FLG_SWIEPH | swe.FLG_SPEED)
         longitud = float(res[0][0])
-        velocidad = float(res[0][3])
+        velocidad = res[0][3]
         signo, grado = obtener_signo_grado(longitud)
         casa = obtener_casa(longitud)
         carta[nombre] = {
             'signo': signo,
-            'grado': float(grado),
-            'casa': int(casa),
+            'grado': grado,
+            'casa': casa,
             'retrogrado': velocidad < 0,
             'longitud': longitud
         }
 
-    # Nodo norte y sur - CORREGIDO con flags
-    try:
-        res = swe.calc_ut(jd, swe.TRUE_NODE, swe.FLG_SWIEPH)
-        longitud = float(res[0][0])
-        signo, grado = obtener_signo_grado(longitud)
-        casa = obtener_casa(longitud)
-        
-        # 🐛 DEBUG - Nodo Norte
-        print(f"🐛 DEBUG Nodo Norte: {longitud:.4f}° = {signo} {grado:.2f}° → Casa {casa}")
-        
-        carta['NODO_NORTE'] = {
-            'signo': signo, 'grado': grado,
-            'casa': casa, 'retrogrado': False,
-            'longitud': longitud
-        }
-
-        longitud_sur = (longitud + 180) % 360
-        signo_s, grado_s = obtener_signo_grado(longitud_sur)
-        casa_s = obtener_casa(longitud_sur)
-        carta['NODO_SUR'] = {
-            'signo': signo_s, 'grado': grado_s,
-            'casa': casa_s, 'retrogrado': False,
-            'longitud': longitud_sur
-        }
+    # Nodo norte, Lilith y Quirón: los no disponibles se omiten
+    # (Quirón queda con un valor centinela). Además de faltar el fichero,
+    # puede fallar por fecha: seas_18.se1 solo cubre 1800-2400.
+    for nombre, num in PUNTOS_OPCIONALES:
+        res = None
+        if PUNTOS_DISPONIBLES.get(nombre):
+            try:
+                res = swe.calc_ut(jd, num, swe.FLG_SWIEPH)
+            except swe.Error as e:
+                logger.debug("%s no calculable para JD %s: %s", nombre, jd, e)
 
-    except Exception as e:
-        print("Nodo error:", e)
+        if res is None:
+            if nombre == 'QUIRON':
+                carta['QUIRON'] = dict(PUNTO_NO_DISPONIBLE)
+            continue
 
-    # Lilith - CORREGIDO usar True Black Moon (osculating)
-    try:
-        res = swe.calc_ut(jd, swe.OSCU_APOG, swe.FLG_SWIEPH)
         longitud = float(res[0][0])
         signo, grado = obtener_signo_grado(longitud)
-        casa = obtener_casa(longitud)
-        carta['LILITH'] = {
+        carta[nombre] = {
             'signo': signo, 'grado': grado,
-            'casa': casa, 'retrogrado': False,
+            'casa': obtener_casa(longitud), 'retrogrado': False,
             'longitud': longitud
         }
-    except:
-        pass
 
-    # Quirón
-    try:
-        res = swe.calc_ut(jd, swe.CHIRON, swe.FLG_SWIEPH)
-        longitud = float(res[0][0])
-        signo, grado = obtener_signo_grado(longitud)
-        casa = obtener_casa(longitud)
-        carta['QUIRON'] = {
-            'signo': signo, 'grado': grado,
-            'casa': casa, 'retrogrado': False,
-            'longitud': longitud
-        }
-    except:
-        carta['QUIRON'] = {
-            'signo': 'N/A', 'grado': 0, 'casa': 0,
-            'retrogrado': False, 'longitud': 0
-        }
+        if nombre == 'NODO_NORTE':
+            longitud_sur = (longitud + 180) % 360
+            signo_s, grado_s = obtener_signo_grado(longitud_sur)
+            carta['NODO_SUR'] = {
+                'signo': signo_s, 'grado': grado_s,
+                'casa': obtener_casa(longitud_sur), 'retrogrado': False,
+                'longitud': longitud_sur
+            }
 
     # Parte de fortuna - CORREGIDO con fórmula día/noche
     sol_long = carta['SOL']['longitud']
@@ -175,9 +186,7 @@ def calcular_carta_natal_sola(año, mes, dia, hora, minuto, latitud, longitud, z
     signo, grado = obtener_signo_grado(fortuna_long)
     casa = obtener_casa(fortuna_long)
     
-    # 🐛 DEBUG - Parte de Fortuna
-    print(f"🐛 DEBUG Parte Fortuna: {fortuna_long:.4f}° = {signo} {grado:.2f}° → Casa {casa}")
-    print(f"🐛 Es diurna? {es_diurna} (Sol en casa {carta['SOL']['casa']})")
+    logger.debug("Parte Fortuna: %.4f° → Casa %s (diurna=%s)", fortuna_long, casa, es_diurna)
     
     carta['PARTE_FORTUNA'] = {
         'signo': signo, 'grado': grado,
@@ -200,24 +209,65 @@ def calcular_carta_natal_sola(año, mes, dia, hora, minuto, latitud, longitud, z
         'retrogrado': False, 'longitud': mc
     }
 
+    return carta, cuspides, cuspides_placidus
+
+
+@lru_cache(maxsize=4096)
+def _calcular_carta_cacheada(año, mes, dia, hora, minuto, latitud, longitud, zona_horaria, sistema_casas):
+    return _calcular_carta(año, mes, dia, hora, minuto, latitud, longitud, zona_horaria, sistema_casas)
+
+
+def _carta(año, mes, dia, hora, minuto, latitud, longitud, zona_horaria, sistema_casas='P'):
+    """
+    Igual que _calcular_carta pero cacheado por datos de nacimiento
+    (lat/lon redondeadas a 6 decimales). Devuelve copias: el resultado
+    cacheado nunca se entrega mutable al llamador.
+    """
+    carta, cuspides, cuspides_placidus = _calcular_carta_cacheada(
+        año, mes, dia, hora, minuto,
+        round(latitud, 6), round(longitud, 6),
+        zona_horaria, sistema_casas
+    )
+    return deepcopy(carta), list(cuspides), list(cuspides_placidus)
+
+
+def limpiar_cache_cartas():
+    _calcular_carta_cacheada.cache_clear()
+
+
+def calcular_carta_natal_sola(año, mes, dia, hora, minuto, latitud, longitud, zona_horaria, sistema_casas='P'):
+    carta, cuspides, _ = _carta(
+        año, mes, dia, hora, minuto, latitud, longitud, zona_horaria, sistema_casas
+    )
+
     # cuspides en signos
-    signos_list = [
-        "ARIES","TAURO","GEMINIS","CANCER","LEO","VIRGO",
-        "LIBRA","ESCORPIO","SAGITARIO","CAPRICORNIO","ACUARIO","PISCIS"
-    ]
-    cuspides_signos = {}
-    for idx, cdeg in enumerate(cuspides, start=1):
-        signo_idx = int(cdeg // 30) % 12
-        cuspides_signos[str(idx)] = signos_list[signo_idx]
-
-    # 🐛 DEBUG - Imprime todas las cúspides
-    print("\n🏠 CÚSPIDES PLACIDUS:")
-    for i, cusp in enumerate(cuspides, start=1):
-        signo_c, grado_c = obtener_signo_grado(cusp)
-        print(f"Casa {i}: {signo_c} {grado_c:.2f}° ({cusp:.2f}°)")
-    print()
+    cuspides_signos = {
+        str(idx): SIGNOS[int(cdeg // 30) % 12]
+        for idx, cdeg in enumerate(cuspides, start=1)
+    }
+
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Cúspides: %s", ", ".join(f"{c:.2f}°" for c in cuspides))
 
     return {
         "carta": carta,
         "cuspides": cuspides_signos
-    }
\ No newline at end of file
+    }
+
+
+def construir_posiciones_natales(año, mes, dia, hora, minuto, latitud, longitud, zona_horaria, sistema_casas='P'):
+    """
+    Datos natales que usa el cálculo de tránsitos, en una sola pasada:
+    longitud de cada punto de la carta y cúspides Placidus en grados
+    (cuspides[0] = ASC).
+    """
+    carta, _, cuspides_placidus = _carta(
+        año, mes, dia, hora, minuto, latitud, longitud, zona_horaria, sistema_casas
+    )
+
+    posiciones = {nombre: info['longitud'] for nombre, info in carta.items()}
+
+    return {
+        "posiciones": posiciones,
+        "cuspides": cuspides_placidus
+    }
@@ -1,15 +1,20 @@
 # main_api.py
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel, Field
 from typing import Literal, Dict, Any
 from pathlib import Path
+import logging
 import os
 import swisseph as swe
 
 # Importa módulos locales
 from carta_natal import calcular_carta_natal_sola as calcular_carta_natal
-from transitos import calcular_transitos_completo
+from carta_natal import construir_posiciones_natales, inicializar_swisseph, limpiar_cache_cartas
+from transitos import calcular_transitos_completo, cerrar_pool, iniciar_pool
+
+logging.basicConfig(level=logging.INFO)
 
 # EPHE path
 BASE_DIR = Path(__file__).resolve().parent
@@ -17,14 +22,42 @@ EPHE_PATH = str(BASE_DIR / "ephe")
 os.makedirs(EPHE_PATH, exist_ok=True)
 swe.set_ephe_path(EPHE_PATH)
 
-app = FastAPI(title="API Carta+Tránsitos - A1")
-app.add_middleware(CORSMiddleware, allow_origins=["*"], allow_credentials=True, allow_methods=["*"], allow_headers=["*"])
+app = FastAPI(title="API Carta+Tránsitos - A1", default_response_class=ORJSONResponse)
+def _lista_env(nombre: str) -> list:
+    return [v.strip() for v in os.environ.get(nombre, "").split(",") if v.strip()]
+
+# Orígenes y cabeceras permitidos, separados por coma, en CORS_ORIGINS y
+# CORS_HEADERS. Sin CORS_ORIGINS se acepta cualquier origen pero sin
+# credenciales: "*" con credenciales deja a cualquier web actuar con las
+# cookies del usuario.
+ALLOWED_ORIGINS = _lista_env("CORS_ORIGINS") or ["*"]
+ALLOWED_HEADERS = _lista_env("CORS_HEADERS") or ["*"]
+CORS_COMODIN = ALLOWED_ORIGINS == ["*"]
+app.add_middleware(
+    CORSMiddleware,
+    allow_origins=ALLOWED_ORIGINS,
+    allow_credentials=not CORS_COMODIN,
+    allow_methods=["GET", "POST"],
+    allow_headers=ALLOWED_HEADERS
+)
 
 @app.on_event("startup")
 def startup():
     swe.set_ephe_path(EPHE_PATH)
+    inicializar_swisseph()
+    # Las cartas cacheadas dependen de las efemérides cargadas
+    limpiar_cache_cartas()
+    iniciar_pool()
+    if CORS_COMODIN:
+        logging.getLogger(__name__).warning(
+            "CORS_ORIGINS no definido: se aceptan todos los orígenes sin credenciales"
+        )
     print(f"[startup] SwissEphem path: {EPHE_PATH}")
 
+@app.on_event("shutdown")
+def shutdown():
+    cerrar_pool()
+
 # ---------------------------
 # MODELS
 # ---------------------------
@@ -75,28 +108,20 @@ def api_calcular_transitos(req: RequestTransitos):
         print(f"{'='*60}\n")
         
         # ------------------------------------------------------
-        # 1) CALCULAR CARTA NATAL (solo para posiciones)
+        # 1) DATOS NATALES: posiciones + cúspides en una sola pasada
         # ------------------------------------------------------
-        carta = calcular_carta_natal(
+        natal = construir_posiciones_natales(
             req.año_natal, req.mes_natal, req.dia_natal,
             req.hora_natal, req.minuto_natal,
             req.latitud_natal, req.longitud_natal,
             req.zona_horaria_natal,
             sistema_casas=req.sistema
         )
+        posiciones_natales = natal["posiciones"]
+        print(f"✅ Posiciones natales: {len(posiciones_natales)}")
 
         # ------------------------------------------------------
-        # 2) EXTRAER POSICIONES NATIVAS
-        # ------------------------------------------------------
-        posiciones_natales = {}
-        if isinstance(carta, dict) and "carta" in carta:
-            for nombre, info in carta["carta"].items():
-                if isinstance(info, dict) and "longitud" in info:
-                    posiciones_natales[nombre] = float(info["longitud"])
-            print(f"✅ Posiciones natales: {len(posiciones_natales)}")
-
-        # ------------------------------------------------------
-        # 3) CALCULAR TRÁNSITOS (sin pasar cúspides - las calcula internamente)
+        # 2) CALCULAR TRÁNSITOS (con las cúspides ya calculadas)
         # ------------------------------------------------------
         print(f"\n🔄 Calculando tránsitos...")
 
@@ -104,7 +129,7 @@ def api_calcular_transitos(req: RequestTransitos):
             req.fecha_inicio,
             req.fecha_final,
             posiciones_natales=posiciones_natales if posiciones_natales else None,
-            cuspides=None,  # ← Ya no pasamos cúspides
+            cuspides=natal["cuspides"],
             incluir_luna=req.incluir_luna,
             incluir_cielo=True,
             sistema=req.sistema,
@@ -0,0 +1,28 @@
+from carta_natal import PUNTO_NO_DISPONIBLE, calcular_carta_natal_sola
+
+
+def test_quiron_fuera_de_efemerides_devuelve_centinela():
+    # seas_18.se1 solo cubre 1800-2400: un nacimiento anterior no debe fallar
+    resultado = calcular_carta_natal_sola(1790, 6, 15, 12, 0, -16.5, -68.15, -4)
+    carta = resultado["carta"]
+
+    assert carta["QUIRON"] == PUNTO_NO_DISPONIBLE
+    assert carta["SOL"]["signo"] == "GEMINIS"
+    assert len(resultado["cuspides"]) == 12
+
+
+def test_esquema_carta_natal_sola():
+    resultado = calcular_carta_natal_sola(1990, 5, 10, 14, 30, -16.5, -68.15, -4)
+    assert set(resultado) == {"carta", "cuspides"}
+
+    for nombre in ("SOL", "LUNA", "MERCURIO", "PLUTON", "ASCENDENTE", "MEDIO_CIELO", "PARTE_FORTUNA"):
+        punto = resultado["carta"][nombre]
+        assert set(punto) == {"signo", "grado", "casa", "retrogrado", "longitud"}
+        assert isinstance(punto["signo"], str)
+        assert isinstance(punto["grado"], float) and 0.0 <= punto["grado"] < 30.0
+        assert isinstance(punto["casa"], int) and 1 <= punto["casa"] <= 12
+        assert isinstance(punto["retrogrado"], bool)
+        assert isinstance(punto["longitud"], float)
+
+    assert list(resultado["cuspides"]) == [str(i) for i in range(1, 13)]
+    assert all(isinstance(s, str) for s in resultado["cuspides"].values())
@@ -0,0 +1,146 @@
+from datetime import datetime
+
+import pytest
+
+import transitos
+from carta_natal import construir_posiciones_natales
+from transitos import (
+    calcular_eclipses,
+    calcular_fases_lunares,
+    calcular_transitos_cielo,
+    calcular_transitos_completo,
+    calcular_transitos_natal,
+    obtener_casa_desde_cuspides,
+)
+
+CLAVES_EVENTO = {
+    "aspecto_transito": {
+        "tipo", "origen", "planeta1", "planeta2", "aspecto", "descripcion",
+        "fecha_inicio", "fecha_exacto", "fecha_fin"
+    },
+    "aspecto": {
+        "tipo", "origen", "planeta_transito", "planeta_natal", "aspecto", "descripcion",
+        "fecha_inicio", "fecha_exacto", "fecha_fin"
+    },
+    "cambio_signo": {"tipo", "origen", "planeta", "signo_anterior", "signo_nuevo", "descripcion", "fecha"},
+    "cambio_casa": {"tipo", "origen", "planeta", "casa_anterior", "casa_nueva", "casa", "descripcion", "fecha"},
+    "retro_inicio": {"tipo", "origen", "planeta", "descripcion", "fecha"},
+    "retro_fin": {"tipo", "origen", "planeta", "descripcion", "fecha"},
+    "eclipse": {"tipo", "subtipo", "descripcion", "fecha", "signo", "grado", "planeta"},
+    "fase_lunar": {"tipo", "subtipo", "descripcion", "fecha", "signo", "grado", "planeta", "_debug_dist"},
+}
+
+
+@pytest.fixture(scope="module", autouse=True)
+def pool():
+    transitos.iniciar_pool()
+    yield
+    transitos.cerrar_pool()
+
+
+def _casa_lineal(long_ec, cuspides):
+    # Búsqueda lineal original, como referencia
+    for i in range(12):
+        a = cuspides[i]
+        b = cuspides[(i + 1) % 12]
+        long_n = long_ec
+        b_n = b
+        if b < a:
+            if long_ec < a:
+                long_n = long_ec + 360.0
+            b_n = b + 360.0
+        if a <= long_n < b_n:
+            return i + 1
+    return 12
+
+
+def test_esquema_eventos_transitos_completo():
+    natal = construir_posiciones_natales(1990, 5, 10, 14, 30, -16.5, -68.15, -4)
+    # Incluye eclipses (25/03, 08/04) y la retrogradación completa de Mercurio (01/04-25/04)
+    salida = calcular_transitos_completo(
+        "2024-03-25", "2024-04-30",
+        posiciones_natales=natal["posiciones"],
+        cuspides=natal["cuspides"]
+    )
+    assert set(salida) == {"periodo", "transitos_natal", "transitos_cielo", "eclipses", "fases_lunares"}
+
+    eventos = []
+    for bloque in ("transitos_natal", "transitos_cielo"):
+        for pe in salida[bloque]:
+            assert set(pe) == {"planeta", "posicion_inicial", "posicion_final", "eventos"}
+            eventos.extend(pe["eventos"])
+    eventos.extend(salida["eclipses"])
+    eventos.extend(salida["fases_lunares"])
+
+    vistos = {ev["tipo"] for ev in eventos}
+    assert vistos == set(CLAVES_EVENTO)
+
+    for ev in eventos:
+        assert set(ev) == CLAVES_EVENTO[ev["tipo"]]
+        assert isinstance(ev["descripcion"], str)
+        for campo in ("fecha", "fecha_inicio", "fecha_exacto", "fecha_fin"):
+            if campo in ev:
+                assert isinstance(ev[campo], str)
+        for campo in ("signo_anterior", "signo_nuevo", "casa_anterior", "casa_nueva", "casa"):
+            if campo in ev:
+                assert type(ev[campo]) is int
+
+
+def test_luna_nueva_al_minuto():
+    # Luna nueva del eclipse total del 8 de abril de 2024: 18:21 UT
+    fases = calcular_fases_lunares("2024-04-01", "2024-04-15")
+    nuevas = [f for f in fases if f["subtipo"] == "Luna Nueva"]
+    assert len(nuevas) == 1
+
+    fecha = datetime.strptime(nuevas[0]["fecha"], "%Y-%m-%d %H:%M:%S")
+    assert abs((fecha - datetime(2024, 4, 8, 18, 21)).total_seconds()) <= 60
+    assert nuevas[0]["signo"] == "ARIES"
+
+
+def test_estacion_retrograda_mercurio():
+    # Mercurio estaciona retrógrado el 21/04/2023 (~08:35 UT): primera hora con velocidad < 0
+    resultado = calcular_transitos_natal("2023-04-15", "2023-04-25", posiciones_natales={})
+    mercurio = next(pe for pe in resultado if pe["planeta"] == "MERCURIO")
+    retros = [ev for ev in mercurio["eventos"] if ev["tipo"] == "retro_inicio"]
+    assert [ev["fecha"] for ev in retros] == ["2023-04-21 09:00"]
+
+
+@pytest.mark.parametrize("asc", [15.0, 200.0, 340.0])
+def test_casa_placidus_igual_que_busqueda_lineal(asc):
+    # Cúspides desiguales a partir del ASC; con ASC en 340° la 2ª ya cruza 0°
+    anchos = [25.0, 35.0, 30.0, 28.0, 32.0, 30.0, 25.0, 35.0, 30.0, 28.0, 32.0, 30.0]
+    cuspides = []
+    lon = asc
+    for ancho in anchos:
+        cuspides.append(lon % 360.0)
+        lon += ancho
+
+    puntos = [x * 0.5 for x in range(720)] + cuspides + [359.999, 0.0]
+    for punto in puntos:
+        assert obtener_casa_desde_cuspides(punto, cuspides) == _casa_lineal(punto, cuspides)
+
+
+def test_ventana_lunar_se_reabre():
+    # En seis semanas la Luna se conjunta con el Sol al menos dos veces:
+    # cada ventana del mismo par/aspecto debe salir como evento propio
+    resultado = calcular_transitos_cielo("2024-01-01", "2024-02-15")
+    luna = next(pe for pe in resultado if pe["planeta"] == "LUNA")
+    conjunciones = [
+        ev for ev in luna["eventos"]
+        if ev["tipo"] == "aspecto_transito" and ev["aspecto"] == "conjuncion"
+        and {ev["planeta1"], ev["planeta2"]} == {"SOL", "LUNA"}
+    ]
+    assert len(conjunciones) >= 2
+    assert len({ev["fecha_inicio"] for ev in conjunciones}) == len(conjunciones)
+    for ev in conjunciones:
+        assert ev["fecha_inicio"] <= ev["fecha_exacto"] <= ev["fecha_fin"]
+
+
+def test_eclipses_2024():
+    descripciones = [e["descripcion"] for e in calcular_eclipses("2024-01-01", "2024-12-31")]
+    assert descripciones == [
+        "Eclipse Solar Total en ARIES",
+        "Eclipse Solar Anular en LIBRA",
+        "Eclipse Lunar Penumbral en LIBRA",
+        "Eclipse Lunar Parcial en PISCIS",
+    ]
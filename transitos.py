@@ -7,11 +7,20 @@ Exporta:
  - calcular_transitos_completo(...)  -> combina ambos
 """
 
-from datetime import datetime, timedelta
-from typing import Dict, Any, List, Optional
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import date, datetime, time, timedelta
+from functools import lru_cache
+from itertools import combinations
+from operator import itemgetter
+from typing import Dict, Any, List, Optional, Tuple
 from pathlib import Path
+import numpy as np
 import swisseph as swe
+import multiprocessing
 import os
+import threading
 
 
     
@@ -20,6 +29,17 @@ EPHE_PATH = str(BASE_DIR / "ephe")
 os.makedirs(EPHE_PATH, exist_ok=True)
 swe.set_ephe_path(EPHE_PATH)
 
+# pyswisseph guarda la ruta de efemérides por hilo: las funciones públicas de
+# este módulo y de carta_natal se llaman desde el threadpool de FastAPI y la
+# fijan en su hilo antes del primer cálculo
+_HILO = threading.local()
+_HILO.ephe_path = True
+
+def asegurar_ephe_path() -> None:
+    if not getattr(_HILO, "ephe_path", False):
+        swe.set_ephe_path(EPHE_PATH)
+        _HILO.ephe_path = True
+
 PLANETAS = {
     'SOL': swe.SUN,
     'LUNA': swe.MOON,
@@ -33,10 +53,10 @@ PLANETAS = {
     'PLUTON': swe.PLUTO
 }
 
-SIGNOS_NOMBRES = [
+SIGNOS_NOMBRES = (
     "ARIES", "TAURO", "GÉMINIS", "CÁNCER", "LEO", "VIRGO",
     "LIBRA", "ESCORPIO", "SAGITARIO", "CAPRICORNIO", "ACUARIO", "PISCIS"
-]
+)
 
 ASPECTOS = {
     "conjuncion": 0.0,
@@ -46,6 +66,8 @@ ASPECTOS = {
     "oposicion": 180.0
 }
 
+ANGULOS_ASPECTOS = np.array(list(ASPECTOS.values()))
+
 ASPECTOS_LABEL = {
     "conjuncion": "conjunción",
     "sextil": "sextil",
@@ -54,6 +76,11 @@ ASPECTOS_LABEL = {
     "oposicion": "oposición"
 }
 
+# (columna en ANGULOS_ASPECTOS, nombre, etiqueta) de cada aspecto
+ASPECTOS_ITEMS = tuple(
+    (a, nombre, ASPECTOS_LABEL.get(nombre, nombre)) for a, nombre in enumerate(ASPECTOS)
+)
+
 ORBES_BASE = {
     "LUNA": 6.0,
     "SOL": 4.0,
@@ -67,50 +94,332 @@ ORBES_BASE = {
     "PLUTON": 1.5
 }
 
+# Horas entre cálculos reales para los planetas lentos (< 0.25°/día);
+# las horas intermedias se interpolan linealmente. El resto: cada hora.
+PASO_MUESTREO_HORAS = {
+    swe.JUPITER: 12,
+    swe.SATURN: 12,
+    swe.URANUS: 12,
+    swe.NEPTUNE: 12,
+    swe.PLUTO: 12
+}
+
 DT_FMT = "%Y-%m-%d %H:%M"
 DT_DAY_FMT = "%Y-%m-%d"
-
-def _norm360(x: float) -> float:
-    x = x % 360.0
-    if x < 0:
-        x += 360.0
-    return x
+PASO_HORA = 1.0 / 24.0
 
 def _ang_diff(a: float, b: float) -> float:
-    diff = abs(_norm360(a) - _norm360(b))
-    if diff > 180:
-        diff = 360 - diff
-    return diff
+    # Separación angular en [0, 180] sin ramas: envolver a (-180, 180] y abs
+    return abs((a - b + 180.0) % 360.0 - 180.0)
 
 def distancia_aspecto(lon1: float, lon2: float, ang_obj: float) -> float:
-    diff = _ang_diff(lon1, lon2)
-    return abs(diff - ang_obj)
+    return abs(_ang_diff(lon1, lon2) - ang_obj)
+
+def _distancias_aspecto(lon1: np.ndarray, lon2) -> np.ndarray:
+    """
+    dist[T, A]: distancia de la separación angular a cada aspecto de ASPECTOS.
+    lon2 puede ser otra serie o un punto fijo (posición natal).
+    """
+    sep = np.abs((lon1 - lon2 + 180.0) % 360.0 - 180.0)
+    return np.abs(sep[:, None] - ANGULOS_ASPECTOS[None, :])
+
+def _aspectos_candidatos(lon1_dia: np.ndarray, lon2_dia: np.ndarray, orbe: float) -> List[int]:
+    """
+    Columnas de ASPECTOS que la separación puede alcanzar en orbe, vistas en
+    muestras diarias: entre dos muestras la separación no se acerca a un
+    aspecto más de medio salto diario del movimiento relativo (más margen).
+    """
+    rel = lon1_dia - lon2_dia
+    if len(rel) < 2 or np.isnan(rel).any():
+        return list(range(len(ANGULOS_ASPECTOS)))
+
+    sep = np.abs((rel + 180.0) % 360.0 - 180.0)
+    salto = np.abs((np.diff(rel) + 180.0) % 360.0 - 180.0).max()
+    holgura = 0.5 * salto + 0.5
+    cerca = np.abs(sep[:, None] - ANGULOS_ASPECTOS[None, :]).min(axis=0) <= orbe + holgura
+    return np.flatnonzero(cerca).tolist()
+
+def _ventanas_aspecto(dist: np.ndarray, orbe: float) -> List[tuple]:
+    """
+    Ventanas en orbe de una columna de distancias horarias, como
+    (k_inicio, k_exacto, k_fin): k_fin es la primera hora fuera de orbe
+    (None si sigue activa al final) y k_exacto el mínimo dentro de la ventana.
+    """
+    en_orbe = dist <= orbe
+    if not en_orbe.any():
+        return []
+
+    # +1 al entrar en orbe, -1 al salir; con bordes a 0 cada inicio tiene su fin
+    bordes = np.diff(en_orbe.astype(np.int8), prepend=0, append=0)
+    inicios = np.flatnonzero(bordes == 1).tolist()
+    fines = np.flatnonzero(bordes == -1).tolist()
+
+    n = len(dist)
+    return [
+        (s, s + int(np.argmin(dist[s:e])), None if e == n else e)
+        for s, e in zip(inicios, fines)
+    ]
+
+def _refinar_exacto(
+    jd0: float, k_inicio: int, k_exacto: int, k_fin: Optional[int], ang: float,
+    num1: int, serie1: np.ndarray, num2: Optional[int], lon2
+) -> int:
+    """
+    Los planetas lentos vienen interpolados cada paso horas, así que el mínimo
+    de una ventana que no llega a perfeccionarse (estación, separación que se
+    da la vuelta) cae en un nodo. Se recalculan hora a hora las ±paso horas
+    alrededor de k_exacto (dentro de la ventana) y se toma el mínimo real.
+    lon2 es la serie del planeta num2, o un punto fijo si num2 es None.
+    """
+    paso = max(PASO_MUESTREO_HORAS.get(num1, 1), PASO_MUESTREO_HORAS.get(num2, 1))
+    if paso == 1:
+        return k_exacto
+
+    k_lo = max(k_inicio, k_exacto - paso)
+    k_hi = min(len(serie1) if k_fin is None else k_fin, k_exacto + paso + 1)
+    tramo1 = _tramo_real(num1, serie1, jd0, k_lo, k_hi)
+    tramo2 = lon2 if num2 is None else _tramo_real(num2, lon2, jd0, k_lo, k_hi)
+    dist = np.abs(np.abs((tramo1 - tramo2 + 180.0) % 360.0 - 180.0) - ang)
+    if np.isnan(dist).all():
+        return k_exacto
+    return k_lo + int(np.nanargmin(dist))
+
+def _indices_cambio(codigos: np.ndarray) -> np.ndarray:
+    """
+    Posiciones i (>= 1) en las que codigos[i] difiere de codigos[i - 1].
+    """
+    return np.flatnonzero(codigos[1:] != codigos[:-1]) + 1
 
 def _calc_long(jd: float, planeta_num: int) -> Optional[float]:
     try:
-        return float(swe.calc_ut(jd, planeta_num)[0][0]) % 360.0
+        return swe.calc_ut(jd, planeta_num)[0][0] % 360.0
     except Exception:
         return None
 
-def _fecha_str(dt: datetime) -> str:
-    return dt.strftime(DT_FMT)
+def _calc_longitudes(planeta_num: int, jd0: float, ks) -> np.ndarray:
+    """
+    Longitudes del planeta en las horas ks (jd0 + k * PASO_HORA), NaN si falla el cálculo.
+    """
+    jds = jd0 + np.asarray(ks, dtype=np.float64) / 24.0
+    muestras = np.empty(len(jds))
+    calc_ut = swe.calc_ut
+
+    # Un solo try para todo el barrido; si algún instante falla (fuera de
+    # las efemérides) se repite muestra a muestra dejando NaN en los fallos
+    try:
+        for i, jd in enumerate(jds.tolist()):
+            muestras[i] = calc_ut(jd, planeta_num)[0][0]
+    except swe.Error:
+        for i, jd in enumerate(jds.tolist()):
+            lon = _calc_long(jd, planeta_num)
+            muestras[i] = np.nan if lon is None else lon
+        return muestras
+
+    return muestras % 360.0
+
+def _serie_longitudes(planeta_num: int, jd0: float, n_horas: int) -> np.ndarray:
+    """
+    Longitud del planeta en cada hora del barrido. Los planetas lentos se
+    calculan cada PASO_MUESTREO_HORAS y las horas intermedias se interpolan.
+    """
+    paso = PASO_MUESTREO_HORAS.get(planeta_num, 1)
+    if paso > 1:
+        ks = list(range(0, n_horas, paso))
+        if ks[-1] != n_horas - 1:
+            ks.append(n_horas - 1)
+        muestras = _calc_longitudes(planeta_num, jd0, ks)
+
+        if not np.isnan(muestras).any():
+            # Desenrollar el salto 360 -> 0 antes de interpolar
+            continua = np.rad2deg(np.unwrap(np.deg2rad(muestras)))
+            return np.interp(np.arange(n_horas), ks, continua) % 360.0
+        # Con huecos no se interpola: se calcula hora a hora
+
+    return _calc_longitudes(planeta_num, jd0, range(n_horas))
+
+def _tramo_real(planeta_num: int, serie: np.ndarray, jd0: float, k_lo: int, k_hi: int) -> np.ndarray:
+    """
+    Longitudes reales de las horas [k_lo, k_hi): las de los planetas lentos
+    se recalculan (en la serie están interpoladas), el resto sale de la serie.
+    """
+    if PASO_MUESTREO_HORAS.get(planeta_num, 1) > 1:
+        return _calc_longitudes(planeta_num, jd0, range(k_lo, k_hi))
+    return serie[k_lo:k_hi]
+
+def _muestrear_longitudes(planeta_nums: List[int], jd0: float, n_horas: int) -> np.ndarray:
+    """
+    Matriz L[T, P] con la longitud de cada planeta (columna) en cada hora (fila).
+    """
+    series = _series_longitudes(planeta_nums, jd0, n_horas)
+    L = np.empty((n_horas, len(planeta_nums)))
+    for pi, n in enumerate(planeta_nums):
+        L[:, pi] = series[n]
+    return L
 
-def _fecha_day_str(dt: datetime) -> str:
-    return dt.strftime(DT_DAY_FMT)
+def _etiquetas_dias(inicio: datetime, n_horas: int) -> List[str]:
+    """
+    Tabla "YYYY-MM-DD" de cada día del barrido (la hora k cae en el día k // 24).
+    """
+    ordinal0 = inicio.toordinal()
+    etiquetas = []
+    for i in range((n_horas + 23) // 24):
+        d = date.fromordinal(ordinal0 + i)
+        etiquetas.append(f"{d.year:04d}-{d.month:02d}-{d.day:02d}")
+    return etiquetas
+
+_HORAS_STR = tuple(f" {h:02d}:00" for h in range(24))
+
+def _fecha_hora_str(dias: List[str], k: int) -> str:
+    # Solo se formatea al emitir eventos; el barrido trabaja con índices de hora
+    return dias[k // 24] + _HORAS_STR[k % 24]
+
+@lru_cache(maxsize=4096)
+def _desc_aspecto(p1: str, asp_label: str, p2: str) -> str:
+    # Las mismas combinaciones se repiten en cada ventana: se formatean una vez
+    return f"{p1} {asp_label} {p2}"
+
+@lru_cache(maxsize=256)
+def _desc_ingreso(p: str, signo_idx: int) -> str:
+    return f"{p} ingresa a {SIGNOS_NOMBRES[signo_idx]}"
+
+def _quitar_orden(eventos: List[Dict[str, Any]]) -> None:
+    # "_k" (hora del barrido) solo sirve para ordenar; no forma parte de la respuesta
+    for ev in eventos:
+        ev.pop("_k", None)
+
+def _parse_dia(fecha: str) -> datetime:
+    # "YYYY-MM-DD" a las 00:00. date.fromisoformat es mucho más rápido, pero
+    # exige ceros a la izquierda: "2024-1-5" sigue aceptándose vía strptime
+    try:
+        return datetime.combine(date.fromisoformat(fecha), time())
+    except ValueError:
+        return datetime.strptime(fecha, DT_DAY_FMT)
+
+def _rejilla_horaria(inicio_day: datetime, final_day: datetime):
+    """
+    Devuelve (jd0, n_horas) para el barrido horario desde las 00:00 de
+    inicio_day hasta las 23:00 de final_day. La hora k corresponde a jd0 + k * PASO_HORA.
+    """
+    jd0 = swe.julday(inicio_day.year, inicio_day.month, inicio_day.day, 0.0)
+    # Con fecha_final anterior a fecha_inicio no hay horas que barrer
+    n_horas = max(0, (final_day - inicio_day).days * 24 + 24)
+    return jd0, n_horas
+
+# Pool de procesos compartido entre peticiones. Lo crea el arranque de la app
+# (iniciar_pool); con "spawn" los workers no heredan hilos de uvicorn.
+_POOL: Optional[ProcessPoolExecutor] = None
+_POOL_LOCK = threading.Lock()
+
+def _inicializar_worker() -> None:
+    swe.set_ephe_path(EPHE_PATH)
+
+def _obtener_pool() -> ProcessPoolExecutor:
+    global _POOL
+    with _POOL_LOCK:
+        if _POOL is None:
+            _POOL = ProcessPoolExecutor(
+                max_workers=os.cpu_count(),
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_inicializar_worker
+            )
+        return _POOL
+
+def _descartar_pool(pool: ProcessPoolExecutor) -> None:
+    # Solo se descarta si nadie lo ha sustituido ya desde otro hilo
+    global _POOL
+    with _POOL_LOCK:
+        if _POOL is pool:
+            _POOL = None
+    pool.shutdown(wait=False)
+
+def iniciar_pool() -> None:
+    _obtener_pool()
+
+def cerrar_pool() -> None:
+    global _POOL
+    with _POOL_LOCK:
+        pool, _POOL = _POOL, None
+    if pool is not None:
+        pool.shutdown(wait=True)
+
+def _ejecutar_en_pool(tareas: List[tuple]) -> List[Any]:
+    """
+    Ejecuta cada (funcion, *args) en el pool y devuelve los resultados en orden.
+    Si un worker muere (BrokenProcessPool) el pool se reconstruye y se reintenta una vez.
+    """
+    for intento in range(2):
+        pool = _obtener_pool()
+        try:
+            futuros = [pool.submit(*tarea) for tarea in tareas]
+            return [f.result() for f in futuros]
+        except BrokenProcessPool:
+            _descartar_pool(pool)
+            if intento == 1:
+                raise
+
+# Caché LRU de series horarias por (planeta, jd0, n_horas), compartida por
+# tránsitos al cielo y a la carta natal y entre peticiones del mismo proceso.
+# Se limita por memoria (cada serie ocupa n_horas float64: ~700 KB por década)
+CACHE_SERIES_MAX_BYTES = 64 * 1024 * 1024
+_CACHE_SERIES: "OrderedDict[tuple, np.ndarray]" = OrderedDict()
+_CACHE_SERIES_LOCK = threading.Lock()
+_cache_series_bytes = 0
+
+def _guardar_series(jd0: float, n_horas: int, nuevas: Dict[int, np.ndarray]) -> None:
+    global _cache_series_bytes
+    with _CACHE_SERIES_LOCK:
+        for n, serie in nuevas.items():
+            # Una serie mayor que todo el presupuesto no se cachea
+            if serie.nbytes > CACHE_SERIES_MAX_BYTES or (n, jd0, n_horas) in _CACHE_SERIES:
+                continue
+            _CACHE_SERIES[(n, jd0, n_horas)] = serie
+            _cache_series_bytes += serie.nbytes
+        while _cache_series_bytes > CACHE_SERIES_MAX_BYTES:
+            _, vieja = _CACHE_SERIES.popitem(last=False)
+            _cache_series_bytes -= vieja.nbytes
+
+def _series_longitudes(planeta_nums: List[int], jd0: float, n_horas: int) -> Dict[int, np.ndarray]:
+    """
+    Series horarias (solo lectura) de varios planetas. Las que no están en
+    caché se calculan en paralelo en el pool de procesos.
+    """
+    series = {}
+    with _CACHE_SERIES_LOCK:
+        for n in planeta_nums:
+            serie = _CACHE_SERIES.get((n, jd0, n_horas))
+            if serie is not None:
+                _CACHE_SERIES.move_to_end((n, jd0, n_horas))
+                series[n] = serie
+
+    pendientes = [n for n in planeta_nums if n not in series]
+    if pendientes:
+        resultados = _ejecutar_en_pool([(_serie_longitudes, n, jd0, n_horas) for n in pendientes])
+        for n, serie in zip(pendientes, resultados):
+            serie.setflags(write=False)
+            series[n] = serie
+
+        _guardar_series(jd0, n_horas, {n: series[n] for n in pendientes})
+
+    return series
+
+def _cuspides_relativas(cuspides) -> np.ndarray:
+    """
+    Cúspides giradas para que el ASC (cuspides[0]) quede en 0°: así quedan
+    ordenadas y la casa de una longitud sale por búsqueda binaria.
+    """
+    return (np.asarray(cuspides, dtype=np.float64) - cuspides[0]) % 360.0
 
 def obtener_casa_desde_cuspides(long_ec: float, cuspides: List[float]) -> int:
-    for i in range(12):
-        a = cuspides[i]
-        b = cuspides[(i + 1) % 12]
-        long_n = long_ec
-        b_n = b
-        if b < a:
-            if long_ec < a:
-                long_n = long_ec + 360.0
-            b_n = b + 360.0
-        if a <= long_n < b_n:
-            return i + 1
-    return 12
+    relativas = _cuspides_relativas(cuspides)
+    return int(np.searchsorted(relativas, (long_ec - cuspides[0]) % 360.0, side="right"))
+
+@lru_cache(maxsize=12)
+def _tabla_wholesign(signo_asc: int) -> Tuple[int, ...]:
+    """
+    Casa Whole Sign de cada signo (índice 0-11) para un signo ascendente dado.
+    """
+    return tuple(((s - signo_asc) % 12) + 1 for s in range(12))
+
 def obtener_casa_desde_cuspides_o_wholesign(
     long_ec: float, 
     cuspides: List[float], 
@@ -122,19 +431,17 @@ def obtener_casa_desde_cuspides_o_wholesign(
     - W (Whole Sign): divide en 12 sectores desde el ASC
     """
     if sistema == "W":
-        # Whole Sign: cada signo = 1 casa
-        signo_punto = int(long_ec // 30) % 12
-        signo_asc = int(cuspides[0] // 30) % 12  # cuspides[0] = ASC
-        casa = ((signo_punto - signo_asc) % 12) + 1
-        return casa
+        # Whole Sign: cada signo = 1 casa (cuspides[0] = ASC)
+        tabla = _tabla_wholesign(int(cuspides[0] // 30) % 12)
+        return tabla[int(long_ec // 30) % 12]
     else:
         # Placidus (original)
         return obtener_casa_desde_cuspides(long_ec, cuspides)
     
 def calcular_transitos_cielo(fecha_inicio: str, fecha_final: str, incluir_luna: bool = True) -> List[Dict[str, Any]]:
-    inicio_day = datetime.strptime(fecha_inicio, DT_DAY_FMT)
-    final_day = datetime.strptime(fecha_final, DT_DAY_FMT)
-    delta = timedelta(hours=1)
+    asegurar_ephe_path()
+    inicio_day = _parse_dia(fecha_inicio)
+    final_day = _parse_dia(fecha_final)
 
     planetas = list(PLANETAS.keys())
     if not incluir_luna and "LUNA" in planetas:
@@ -149,108 +456,220 @@ def calcular_transitos_cielo(fecha_inicio: str, fecha_final: str, incluir_luna:
             n = PLANETAS[p]
             long_ini = _calc_long(jd_ini, n)
             long_fin = _calc_long(jd_fin, n)
-            out[p]["posicion_inicial"] = {"longitud": float(long_ini), "grado": float(long_ini % 30)}
-            out[p]["posicion_final"] = {"longitud": float(long_fin), "grado": float(long_fin % 30)}
+            out[p]["posicion_inicial"] = {"longitud": long_ini, "grado": long_ini % 30}
+            out[p]["posicion_final"] = {"longitud": long_fin, "grado": long_fin % 30}
     except Exception:
         pass
 
-    ventanas = {}
-    fecha = inicio_day
-    last_end = final_day + timedelta(hours=23)
+    jd0, n_horas = _rejilla_horaria(inicio_day, final_day)
+    if n_horas == 0:
+        return [out[p] for p in planetas]
 
-    while fecha <= last_end:
-        jd = swe.julday(fecha.year, fecha.month, fecha.day, fecha.hour)
+    dias = _etiquetas_dias(inicio_day, n_horas)
+    last_fin = _fecha_hora_str(dias, n_horas - 1)
 
-        longitudes = {}
-        for p in planetas:
-            longitudes[p] = _calc_long(jd, PLANETAS[p])
-
-        for i in range(len(planetas)):
-            for j in range(i + 1, len(planetas)):
-                p1 = planetas[i]
-                p2 = planetas[j]
-                lon1 = longitudes.get(p1)
-                lon2 = longitudes.get(p2)
-                if lon1 is None or lon2 is None:
-                    continue
-                if p1 == p2:
-                    continue
+    # Todas las longitudes del periodo de una vez; el barrido solo lee la matriz
+    nums = [PLANETAS[p] for p in planetas]
+    L = _muestrear_longitudes(nums, jd0, n_horas)
+
+    # Tabla de pares (i, j, p1, p2, orbe): se construye una vez por llamada
+    pares = [
+        (i, j, planetas[i], planetas[j], min(ORBES_BASE.get(planetas[i], 2.0), ORBES_BASE.get(planetas[j], 2.0)))
+        for i, j in combinations(range(len(planetas)), 2)
+    ]
 
-                for asp_name, ang in ASPECTOS.items():
-                    orbe = min(ORBES_BASE.get(p1, 2.0), ORBES_BASE.get(p2, 2.0))
-                    dist = distancia_aspecto(lon1, lon2, ang)
-                    clave = f"{p1}__{p2}__{asp_name}"
-
-                    estado = ventanas.get(clave)
-
-                    if dist <= orbe and estado is None:
-                        ventanas[clave] = {
-                            "activo": True,
-                            "fecha_inicio": _fecha_str(fecha),
-                            "fecha_exacto": _fecha_str(fecha),
-                            "dist_min": dist
-                        }
-
-                    elif estado is not None and estado.get("activo"):
-                        if dist < estado.get("dist_min", 9999.0):
-                            estado["dist_min"] = dist
-                            estado["fecha_exacto"] = _fecha_str(fecha)
-
-                        if dist > orbe:
-                            estado["activo"] = False
-                            evento = {
-                                "tipo": "aspecto_transito",
-                                "origen": "transito_transito",
-                                "planeta1": p1,
-                                "planeta2": p2,
-                                "aspecto": asp_name,
-                                "descripcion": f"{p1} {ASPECTOS_LABEL.get(asp_name, asp_name)} {p2}",
-                                "fecha_inicio": estado["fecha_inicio"],
-                                "fecha_exacto": estado["fecha_exacto"],
-                                "fecha_fin": _fecha_str(fecha)
-                            }
-                            out[p1]["eventos"].append(evento)
-                            out[p2]["eventos"].append(evento)
-
-        fecha += delta
-    # cerrar ventanas activas
-    last_fin = (final_day + timedelta(hours=23)).strftime(DT_FMT)
-    for clave, estado in list(ventanas.items()):
-        if estado.get("activo"):
-            partes = clave.split("__")
-            if len(partes) >= 3:
-                p1, p2, asp = partes[0], partes[1], partes[2]
+    # Muestras diarias (y la última hora) para descartar aspectos imposibles
+    L_dia = L[np.r_[0:n_horas:24, n_horas - 1]]
+
+    for i, j, p1, p2, orbe in pares:
+        candidatos = _aspectos_candidatos(L_dia[:, i], L_dia[:, j], orbe)
+        if not candidatos:
+            continue
+        dist = _distancias_aspecto(L[:, i], L[:, j])
+
+        for a, asp_name, asp_label in (ASPECTOS_ITEMS[c] for c in candidatos):
+            for k_inicio, k_exacto, k_fin in _ventanas_aspecto(dist[:, a], orbe):
+                k_exacto = _refinar_exacto(
+                    jd0, k_inicio, k_exacto, k_fin, ANGULOS_ASPECTOS[a],
+                    nums[i], L[:, i], nums[j], L[:, j]
+                )
                 evento = {
                     "tipo": "aspecto_transito",
                     "origen": "transito_transito",
                     "planeta1": p1,
                     "planeta2": p2,
-                    "aspecto": asp,
-                    "descripcion": f"{p1} {ASPECTOS_LABEL.get(asp, asp)} {p2}",
-                    "fecha_inicio": estado["fecha_inicio"],
-                    "fecha_exacto": estado.get("fecha_exacto", estado["fecha_inicio"]),
-                    "fecha_fin": last_fin
+                    "aspecto": asp_name,
+                    "descripcion": _desc_aspecto(p1, asp_label, p2),
+                    "fecha_inicio": _fecha_hora_str(dias, k_inicio),
+                    "fecha_exacto": _fecha_hora_str(dias, k_exacto),
+                    "fecha_fin": last_fin if k_fin is None else _fecha_hora_str(dias, k_fin),
+                    "_k": k_exacto
                 }
                 out[p1]["eventos"].append(evento)
                 out[p2]["eventos"].append(evento)
 
-    def _key(ev):
-        for f in ("fecha_exacto", "fecha_inicio", "fecha_fin"):
-            if f in ev and ev[f]:
-                try:
-                    return datetime.strptime(ev[f], DT_FMT)
-                except Exception:
-                    pass
-        return datetime.min
-
     resultado = []
     for p in planetas:
         pe = out[p]
-        pe["eventos"] = sorted(pe["eventos"], key=_key)
+        pe["eventos"].sort(key=itemgetter("_k"))
         resultado.append(pe)
 
+    # Los eventos de aspecto se comparten entre dos planetas: limpiar al final
+    for pe in resultado:
+        _quitar_orden(pe["eventos"])
+
     return resultado
 
+def _hora_estacion(planeta_num: int, jd0: float, k_lo: int, k_hi: int, retro: bool) -> Optional[int]:
+    """
+    Primera hora de (k_lo, k_hi] en la que el planeta ya está en el estado
+    nuevo (retro = velocidad < 0), por bisección con FLG_SPEED.
+    None si los extremos no acotan la estación.
+    """
+    def es_retro(k: int) -> bool:
+        return swe.calc_ut(jd0 + k * PASO_HORA, planeta_num, swe.FLG_SPEED)[0][3] < 0
+
+    try:
+        if es_retro(k_lo) == retro or es_retro(k_hi) != retro:
+            return None
+        while k_hi - k_lo > 1:
+            medio = (k_lo + k_hi) // 2
+            if es_retro(medio) == retro:
+                k_hi = medio
+            else:
+                k_lo = medio
+    except swe.Error:
+        return None
+    return k_hi
+
+def _transitos_natal_planeta(
+    p: str,
+    serie: np.ndarray,
+    jd0: float,
+    inicio_day: datetime,
+    posiciones_natales: Dict[str, float],
+    cuspides: Optional[List[float]],
+    sistema: str
+) -> List[Dict[str, Any]]:
+    """
+    Eventos de un único planeta en tránsito sobre la carta natal a partir de
+    su serie horaria de longitudes (cambios de signo, de casa, retrogradaciones
+    y aspectos a puntos natales). Se ejecuta en un proceso del pool, por eso
+    solo recibe datos serializables.
+    """
+    eventos = []
+    n_horas = len(serie)
+    dias = _etiquetas_dias(inicio_day, n_horas)
+
+    # Constantes del barrido: se validan/convierten una sola vez
+    usar_casas = bool(cuspides) and len(cuspides) == 12
+    if usar_casas:
+        cuspides = tuple(cuspides)
+
+    # Los cambios se buscan solo entre muestras válidas (las NaN se saltan)
+    validos = np.flatnonzero(~np.isnan(serie))
+    lons = serie[validos]
+    horas = validos.tolist()
+
+    # Cambios de signo
+    signos = (lons // 30).astype(np.int64) % 12
+    for i in _indices_cambio(signos).tolist():
+        k = horas[i]
+        signo_idx = int(signos[i])
+        eventos.append({
+            "tipo": "cambio_signo",
+            "origen": "evento_transito",
+            "planeta": p,
+            "signo_anterior": int(signos[i - 1]),
+            "signo_nuevo": signo_idx,
+            "descripcion": _desc_ingreso(p, signo_idx),
+            "fecha": _fecha_hora_str(dias, k),
+            "_k": k
+        })
+
+    # Cambios de casa
+    if usar_casas:
+        if sistema == "W":
+            # Whole Sign: la casa sale directamente del signo por tabla
+            tabla = np.array(_tabla_wholesign(int(cuspides[0] // 30) % 12), dtype=np.int64)
+            casas = tabla[signos]
+        else:
+            # Placidus: búsqueda binaria sobre las cúspides giradas al ASC
+            relativas = _cuspides_relativas(cuspides)
+            casas = np.searchsorted(relativas, (lons - cuspides[0]) % 360.0, side="right")
+        for i in _indices_cambio(casas).tolist():
+            k = horas[i]
+            casa_now = int(casas[i])
+            eventos.append({
+                "tipo": "cambio_casa",
+                "origen": "evento_transito",
+                "planeta": p,
+                "casa_anterior": int(casas[i - 1]),
+                "casa_nueva": casa_now,
+                "casa": casa_now,
+                "descripcion": f"{p} ingresa a casa {casa_now}",
+                "fecha": _fecha_hora_str(dias, k),
+                "_k": k
+            })
+
+    # Retrogradación: el cambio de signo de la diferencia entre muestras localiza
+    # la estación; la hora se fija con FLG_SPEED (primera hora con la velocidad
+    # ya cambiada). La diferencia hacia atrás va ~media hora por detrás de la
+    # velocidad, y en los lentos la serie está interpolada cada paso horas.
+    n = PLANETAS[p]
+    paso = PASO_MUESTREO_HORAS.get(n, 1)
+    antes = max(paso, 2)
+    # retro[m] describe el paso de la muestra m a la m + 1
+    retro = np.signbit((np.diff(lons) + 180.0) % 360.0 - 180.0)
+    for f in np.flatnonzero(np.diff(retro)).tolist():
+        is_retro = bool(retro[f + 1])
+        k = horas[f + 2]
+        k_estacion = _hora_estacion(n, jd0, max(0, k - antes), min(n_horas - 1, k + paso), is_retro)
+        if k_estacion is not None:
+            k = k_estacion
+        eventos.append({
+            "tipo": "retro_inicio" if is_retro else "retro_fin",
+            "origen": "evento_transito",
+            "planeta": p,
+            "descripcion": f"{p} {'inicia' if is_retro else 'termina'} movimiento retrógrado",
+            "fecha": _fecha_hora_str(dias, k),
+            "_k": k
+        })
+
+    # Aspectos a puntos natales: una columna de distancias por (punto, aspecto)
+    last_fin = _fecha_hora_str(dias, n_horas - 1)
+
+    for natal_name, natal_long in posiciones_natales.items():
+        orbe = min(
+            ORBES_BASE.get(p, 2.0),
+            ORBES_BASE.get(natal_name, ORBES_BASE.get(p, 2.0))
+        )
+        dist = _distancias_aspecto(serie, natal_long)
+
+        for a, asp_name, asp_label in ASPECTOS_ITEMS:
+            for k_inicio, k_exacto, k_fin in _ventanas_aspecto(dist[:, a], orbe):
+                k_exacto = _refinar_exacto(
+                    jd0, k_inicio, k_exacto, k_fin, ANGULOS_ASPECTOS[a],
+                    n, serie, None, natal_long
+                )
+                evento = {
+                    "tipo": "aspecto",
+                    "origen": "transito_natal",
+                    "planeta_transito": p,
+                    "planeta_natal": natal_name,
+                    "aspecto": asp_name,
+                    "descripcion": _desc_aspecto(p, asp_label, natal_name),
+                    "fecha_inicio": _fecha_hora_str(dias, k_inicio),
+                    "fecha_exacto": _fecha_hora_str(dias, k_exacto),
+                    "fecha_fin": last_fin if k_fin is None else _fecha_hora_str(dias, k_fin),
+                    "_k": k_exacto
+                }
+                eventos.append(evento)
+
+    eventos.sort(key=itemgetter("_k"))
+    _quitar_orden(eventos)
+    return eventos
+
 # ============================================================
 # TRANSITOS SOBRE CARTA NATAL
 # ============================================================
@@ -271,10 +690,10 @@ def calcular_transitos_natal(
     longitud_natal: Optional[float] = None,
     zona_horaria_natal: int = -4 
 ) -> List[Dict[str, Any]]:
+    asegurar_ephe_path()
 
-    inicio_day = datetime.strptime(fecha_inicio, DT_DAY_FMT)
-    final_day = datetime.strptime(fecha_final, DT_DAY_FMT)
-    delta = timedelta(hours=1)
+    inicio_day = _parse_dia(fecha_inicio)
+    final_day = _parse_dia(fecha_final)
     
     # ⬇️ AGREGAR ESTA SECCIÓN COMPLETA:
     # ============================================================
@@ -338,162 +757,25 @@ def calcular_transitos_natal(
     except Exception:
         pass
 
-    ventanas = {}
-    estado_prev = {p: {"signo_idx": None, "casa": None, "retro": None} for p in planetas}
-
-    fecha = inicio_day
-    last_end = final_day + timedelta(hours=23)
-
-    while fecha <= last_end:
-        jd = swe.julday(fecha.year, fecha.month, fecha.day, fecha.hour)
-
-        for p in planetas:
-            n = PLANETAS[p]
-            lon_now = _calc_long(jd, n)
-            if lon_now is None:
-                continue
-
-            signo_idx = int(lon_now // 30) % 12
-            prev_signo = estado_prev[p]["signo_idx"]
-
-            if prev_signo is None:
-                estado_prev[p]["signo_idx"] = signo_idx
+    jd0, n_horas = _rejilla_horaria(inicio_day, final_day)
+    if n_horas == 0:
+        return [out[p] for p in planetas]
 
-            elif prev_signo != signo_idx:
-                evento = {
-                    "tipo": "cambio_signo",
-                    "origen": "evento_transito",
-                    "planeta": p,
-                    "signo_anterior": prev_signo,
-                    "signo_nuevo": signo_idx,
-                    "descripcion": f"{p} ingresa a {SIGNOS_NOMBRES[signo_idx]}",
-                    "fecha": _fecha_str(fecha)
-                }
-                out[p]["eventos"].append(evento)
-                estado_prev[p]["signo_idx"] = signo_idx
-
-            if cuspides and len(cuspides) == 12:
-                # ⬇️ USAR LA NUEVA FUNCIÓN
-                casa_now = obtener_casa_desde_cuspides_o_wholesign(lon_now, cuspides, sistema)
-                prev_casa = estado_prev[p]["casa"]
-
-                if prev_casa is None:
-                    estado_prev[p]["casa"] = casa_now
-
-                elif prev_casa != casa_now:
-                    evento = {
-                        "tipo": "cambio_casa",
-                        "origen": "evento_transito",
-                        "planeta": p,
-                        "casa_anterior": prev_casa,
-                        "casa_nueva": casa_now,
-                        "casa": casa_now,
-                        "descripcion": f"{p} ingresa a casa {casa_now}",
-                        "fecha": _fecha_str(fecha)
-                    }
-                    out[p]["eventos"].append(evento)
-                    estado_prev[p]["casa"] = casa_now
+    natales = dict(posiciones_natales) if posiciones_natales else {}
+    cuspides_lista = list(cuspides) if cuspides else None
+    series = _series_longitudes([PLANETAS[p] for p in planetas], jd0, n_horas)
 
-            try:
-                vel = float(swe.calc_ut(jd, n, swe.FLG_SWIEPH | swe.FLG_SPEED)[0][3])
-            except Exception:
-                vel = None
-
-            prev_retro = estado_prev[p]["retro"]
-
-            if prev_retro is None and vel is not None:
-                estado_prev[p]["retro"] = (vel < 0)
-
-            elif vel is not None:
-                is_retro = vel < 0
-                if prev_retro != is_retro:
-                    estado_prev[p]["retro"] = is_retro
-                    evento = {
-                        "tipo": "retro_inicio" if is_retro else "retro_fin",
-                        "origen": "evento_transito",
-                        "planeta": p,
-                        "descripcion": f"{p} {'inicia' if is_retro else 'termina'} movimiento retrógrado",
-                        "fecha": _fecha_str(fecha)
-                    }
-                    out[p]["eventos"].append(evento)
-
-            if posiciones_natales:
-                for natal_name, natal_long in posiciones_natales.items():
-                    for asp_name, ang in ASPECTOS.items():
-                        orbe = min(
-                            ORBES_BASE.get(p, 2.0),
-                            ORBES_BASE.get(natal_name, ORBES_BASE.get(p, 2.0))
-                        )
-                        dist = distancia_aspecto(lon_now, natal_long, ang)
-                        clave = f"{p}__{natal_name}__{asp_name}"
-                        estado = ventanas.get(clave)
-
-                        if dist <= orbe and estado is None:
-                            ventanas[clave] = {
-                                "activo": True,
-                                "fecha_inicio": _fecha_str(fecha),
-                                "fecha_exacto": _fecha_str(fecha),
-                                "dist_min": dist
-                            }
-
-                        elif estado is not None and estado.get("activo"):
-                            if dist < estado.get("dist_min", 9999.0):
-                                estado["dist_min"] = dist
-                                estado["fecha_exacto"] = _fecha_str(fecha)
-
-                            if dist > orbe:
-                                estado["activo"] = False
-                                evento = {
-                                    "tipo": "aspecto",
-                                    "origen": "transito_natal",
-                                    "planeta_transito": p,
-                                    "planeta_natal": natal_name,
-                                    "aspecto": asp_name,
-                                    "descripcion": f"{p} {ASPECTOS_LABEL.get(asp_name, asp_name)} {natal_name}",
-                                    "fecha_inicio": estado["fecha_inicio"],
-                                    "fecha_exacto": estado["fecha_exacto"],
-                                    "fecha_fin": _fecha_str(fecha)
-                                }
-                                out[p]["eventos"].append(evento)
-
-        fecha += delta
-
-    last_fin = (final_day + timedelta(hours=23)).strftime(DT_FMT)
-
-    for clave, estado in list(ventanas.items()):
-        if estado.get("activo"):
-            partes = clave.split("__")
-            if len(partes) >= 3:
-                p, natal, asp = partes
-                evento = {
-                    "tipo": "aspecto",
-                    "origen": "transito_natal",
-                    "planeta_transito": p,
-                    "planeta_natal": natal,
-                    "aspecto": asp,
-                    "descripcion": f"{p} {ASPECTOS_LABEL.get(asp, asp)} {natal}",
-                    "fecha_inicio": estado["fecha_inicio"],
-                    "fecha_exacto": estado.get("fecha_exacto", estado["fecha_inicio"]),
-                    "fecha_fin": last_fin
-                }
-                out[p]["eventos"].append(evento)
-
-    def _key(ev):
-        for f in ("fecha_exacto", "fecha_inicio", "fecha"):
-            if f in ev and ev[f]:
-                try:
-                    return datetime.strptime(ev[f], DT_FMT)
-                except:
-                    try:
-                        return datetime.strptime(ev[f], DT_DAY_FMT)
-                    except:
-                        pass
-        return datetime.min
+    # Cada planeta se barre de forma independiente: se reparten entre procesos
+    eventos = _ejecutar_en_pool([
+        (_transitos_natal_planeta, p, series[PLANETAS[p]], jd0, inicio_day,
+         natales, cuspides_lista, sistema)
+        for p in planetas
+    ])
 
     resultado = []
-    for p in planetas:
+    for p, eventos_p in zip(planetas, eventos):
         pe = out[p]
-        pe["eventos"] = sorted(pe["eventos"], key=_key)
+        pe["eventos"] = eventos_p
         resultado.append(pe)
 
     return resultado
@@ -554,236 +836,195 @@ def calcular_transitos_completo(
     return salida
 # Agregar esta función a transitos.py
 
-def calcular_eclipses(fecha_inicio: str, fecha_final: str) -> List[Dict[str, Any]]:
-    inicio_day = datetime.strptime(fecha_inicio, DT_DAY_FMT)
-    final_day = datetime.strptime(fecha_final, DT_DAY_FMT)
-
-    jd_inicio = swe.julday(inicio_day.year, inicio_day.month, inicio_day.day, 0)
-    jd_final  = swe.julday(final_day.year, final_day.month, final_day.day, 23.99)
-
-    eclipses = []
-
-    # -----------------------------
-    # 🌞 ECLIPSES SOLARES
-    # -----------------------------
-    jd = jd_inicio - 40
+def _iter_eclipses(when_fn, jd_inicio: float, jd_final: float):
+    """
+    Recorre los eclipses que devuelve when_fn (sol_eclipse_when_glob o
+    lun_eclipse_when) entre jd_inicio y jd_final. Produce (flags, jd_eclipse).
+    """
+    jd = jd_inicio
     while True:
-        res = swe.sol_eclipse_when_glob(jd, swe.FLG_SWIEPH)
+        res = when_fn(jd, swe.FLG_SWIEPH)
         jd_eclipse = res[1][0]
 
         if jd_eclipse > jd_final:
             break
 
         if jd_eclipse >= jd_inicio:
-            y, m, d = swe.revjul(jd_eclipse)[:3]
-            long_sol = _calc_long(jd_eclipse, swe.SUN)
-            signo = SIGNOS_NOMBRES[int(long_sol // 30)]
-
-            # Tipo correcto
-            flags = res[0]
-            if flags & swe.ECL_TOTAL:
-                tipo = "Eclipse Solar Total"
-            elif flags & swe.ECL_ANNULAR:
-                tipo = "Eclipse Solar Anular"
-            elif flags & swe.ECL_PARTIAL:
-                tipo = "Eclipse Solar Parcial"
-            else:
-                tipo = "Eclipse Solar"
-
-            eclipses.append({
-                "tipo": "eclipse",
-                "subtipo": "solar",
-                "descripcion": f"{tipo} en {signo}",
-                "fecha": f"{y}-{m:02d}-{d:02d}",
-                "signo": signo,
-                "grado": long_sol % 30,
-                "planeta": "SOL"
-            })
+            yield res[0], jd_eclipse
 
-        jd = jd_eclipse + 170  # Saltar al siguiente posible eclipse
+        # when_fn ya busca el siguiente eclipse: basta con pasar este
+        jd = jd_eclipse + 1.0
 
+def _eclipses_solares(jd_inicio: float, jd_final: float) -> List[Dict[str, Any]]:
+    eclipses = []
+    for flags, jd_eclipse in _iter_eclipses(swe.sol_eclipse_when_glob, jd_inicio, jd_final):
+        y, m, d = swe.revjul(jd_eclipse)[:3]
+        long_sol = _calc_long(jd_eclipse, swe.SUN)
+        signo = SIGNOS_NOMBRES[int(long_sol // 30)]
+
+        # Tipo correcto
+        if flags & swe.ECL_TOTAL:
+            tipo = "Eclipse Solar Total"
+        elif flags & swe.ECL_ANNULAR:
+            tipo = "Eclipse Solar Anular"
+        elif flags & swe.ECL_PARTIAL:
+            tipo = "Eclipse Solar Parcial"
+        else:
+            tipo = "Eclipse Solar"
+
+        eclipses.append({
+            "tipo": "eclipse",
+            "subtipo": "solar",
+            "descripcion": f"{tipo} en {signo}",
+            "fecha": f"{y}-{m:02d}-{d:02d}",
+            "signo": signo,
+            "grado": long_sol % 30,
+            "planeta": "SOL"
+        })
+    return eclipses
 
-    # -----------------------------
-    # 🌕 ECLIPSES LUNARES
-    # -----------------------------
-    jd = jd_inicio - 40
-    while True:
-        res = swe.lun_eclipse_when(jd, swe.FLG_SWIEPH)
-        jd_eclipse = res[1][0]
+def _eclipses_lunares(jd_inicio: float, jd_final: float) -> List[Dict[str, Any]]:
+    eclipses = []
+    for flags, jd_eclipse in _iter_eclipses(swe.lun_eclipse_when, jd_inicio, jd_final):
+        y, m, d = swe.revjul(jd_eclipse)[:3]
+        long_luna = _calc_long(jd_eclipse, swe.MOON)
+        signo = SIGNOS_NOMBRES[int(long_luna // 30)]
+
+        if flags & swe.ECL_TOTAL:
+            tipo = "Eclipse Lunar Total"
+        elif flags & swe.ECL_PARTIAL:
+            tipo = "Eclipse Lunar Parcial"
+        elif flags & swe.ECL_PENUMBRAL:
+            tipo = "Eclipse Lunar Penumbral"
+        else:
+            tipo = "Eclipse Lunar"
+
+        eclipses.append({
+            "tipo": "eclipse",
+            "subtipo": "lunar",
+            "descripcion": f"{tipo} en {signo}",
+            "fecha": f"{y}-{m:02d}-{d:02d}",
+            "signo": signo,
+            "grado": long_luna % 30,
+            "planeta": "LUNA"
+        })
+    return eclipses
 
-        if jd_eclipse > jd_final:
-            break
+def calcular_eclipses(fecha_inicio: str, fecha_final: str) -> List[Dict[str, Any]]:
+    inicio_day = _parse_dia(fecha_inicio)
+    final_day = _parse_dia(fecha_final)
 
-        if jd_eclipse >= jd_inicio:
-            y, m, d = swe.revjul(jd_eclipse)[:3]
-            long_luna = _calc_long(jd_eclipse, swe.MOON)
-            signo = SIGNOS_NOMBRES[int(long_luna // 30)]
-
-            flags = res[0]
-            if flags & swe.ECL_TOTAL:
-                tipo = "Eclipse Lunar Total"
-            elif flags & swe.ECL_PARTIAL:
-                tipo = "Eclipse Lunar Parcial"
-            elif flags & swe.ECL_PENUMBRAL:
-                tipo = "Eclipse Lunar Penumbral"
-            else:
-                tipo = "Eclipse Lunar"
-
-            eclipses.append({
-                "tipo": "eclipse",
-                "subtipo": "lunar",
-                "descripcion": f"{tipo} en {signo}",
-                "fecha": f"{y}-{m:02d}-{d:02d}",
-                "signo": signo,
-                "grado": long_luna % 30,
-                "planeta": "LUNA"
-            })
+    jd_inicio = swe.julday(inicio_day.year, inicio_day.month, inicio_day.day, 0)
+    jd_final  = swe.julday(final_day.year, final_day.month, final_day.day, 23.99)
 
-        jd = jd_eclipse + 170
+    # 🌞 solares y 🌕 lunares son búsquedas independientes: una en cada proceso
+    solares, lunares = _ejecutar_en_pool([
+        (_eclipses_solares, jd_inicio, jd_final),
+        (_eclipses_lunares, jd_inicio, jd_final)
+    ])
 
-    return eclipses
+    return solares + lunares
+
+def _elongacion_luna(jd: float) -> Optional[float]:
+    lon_sol = _calc_long(jd, swe.SUN)
+    lon_luna = _calc_long(jd, swe.MOON)
+    if lon_sol is None or lon_luna is None:
+        return None
+    return (lon_luna - lon_sol) % 360
+
+def _desfase(elong: float, ang_obj: float) -> float:
+    # Diferencia con signo entre la elongación y el objetivo, en (-180, 180]
+    return ((elong - ang_obj + 180) % 360) - 180
 
 def calcular_fases_lunares(fecha_inicio: str, fecha_final: str) -> List[Dict[str, Any]]:
     """
     Calcula Luna Nueva, Cuarto Creciente, Luna Llena y Cuarto Menguante
     buscando el momento exacto de elongación = 0°, 90°, 180°, 270°.
     """
-    inicio = datetime.strptime(fecha_inicio, DT_DAY_FMT)
-    fin = datetime.strptime(fecha_final, DT_DAY_FMT)
-    
+    asegurar_ephe_path()
+    inicio = _parse_dia(fecha_inicio)
+    fin = _parse_dia(fecha_final)
+
+    jd_inicio = swe.julday(inicio.year, inicio.month, inicio.day, 0.0)
+    jd_limite = swe.julday(fin.year, fin.month, fin.day, 0.0) + 1.0
+
     fases = []
-    
-    # 🔧 Estrategia: buscar mínimos de distancia a cada objetivo
-    # en vez de detectar cruces (más robusto)
-    
+
     objetivos = [
         ("Luna Nueva", 0),
         ("Cuarto Creciente", 90),
         ("Luna Llena", 180),
         ("Cuarto Menguante", 270)
     ]
-    
-    # Paso 1: Escaneo grueso cada 6 horas para encontrar regiones candidatas
-    delta_grueso = timedelta(hours=6)
-    candidatos = {nombre: [] for nombre, _ in objetivos}
-    
-    fecha = inicio
-    while fecha <= fin + timedelta(days=1):
-        jd = swe.julday(fecha.year, fecha.month, fecha.day, 
-                        fecha.hour + fecha.minute / 60.0)
-        
-        lon_sol = _calc_long(jd, swe.SUN)
-        lon_luna = _calc_long(jd, swe.MOON)
-        
-        if lon_sol is not None and lon_luna is not None:
-            elong = (lon_luna - lon_sol) % 360
-            
-            # Calcular distancia a cada objetivo
+
+    # La elongación avanza ~11-14°/día: en un tramo de 7 días cada objetivo
+    # se cruza como mucho una vez, y el cruce es real cuando el desfase pasa
+    # de negativo a >= 0 (el salto de +180 a -180 va en sentido contrario).
+    paso = 7.0
+    tolerancia = 1.0 / 1440.0  # 1 minuto
+
+    a = jd_inicio
+    elong_a = _elongacion_luna(a)
+    while a < jd_limite:
+        b = min(a + paso, jd_limite)
+        elong_b = _elongacion_luna(b)
+
+        if elong_a is not None and elong_b is not None:
             for nombre, ang_obj in objetivos:
-                dist = min(abs(elong - ang_obj), 360 - abs(elong - ang_obj))
-                
-                # Si está dentro de 45° del objetivo, es candidato
-                if dist < 45:
-                    candidatos[nombre].append((fecha, dist, elong))
-        
-        fecha += delta_grueso
-    
-    # Paso 2: Refinar cada candidato con búsqueda fina
-    for nombre, ang_obj in objetivos:
-        regiones = candidatos[nombre]
-        if not regiones:
-            continue
-        
-        # Agrupar candidatos cercanos en ventanas de 3 días
-        regiones.sort(key=lambda x: x[0])
-        ventanas = []
-        ventana_actual = [regiones[0]]
-        
-        for i in range(1, len(regiones)):
-            if regiones[i][0] - ventana_actual[-1][0] < timedelta(days=3):
-                ventana_actual.append(regiones[i])
-            else:
-                ventanas.append(ventana_actual)
-                ventana_actual = [regiones[i]]
-        ventanas.append(ventana_actual)
-        
-        # Refinar cada ventana
-        for ventana in ventanas:
-            # Encontrar el mejor candidato en la ventana
-            mejor = min(ventana, key=lambda x: x[1])
-            fecha_base = mejor[0]
-            
-            # Búsqueda fina: ±12 horas con paso de 15 minutos
-            delta_fino = timedelta(minutes=15)
-            mejor_dist = 999
-            mejor_fecha = fecha_base
-            mejor_elong = mejor[2]
-            
-            fecha_busqueda = fecha_base - timedelta(hours=12)
-            fecha_limite = fecha_base + timedelta(hours=12)
-            
-            while fecha_busqueda <= fecha_limite:
-                jd = swe.julday(fecha_busqueda.year, fecha_busqueda.month, 
-                               fecha_busqueda.day, 
-                               fecha_busqueda.hour + fecha_busqueda.minute / 60.0)
-                
-                lon_sol = _calc_long(jd, swe.SUN)
-                lon_luna = _calc_long(jd, swe.MOON)
-                
-                if lon_sol is not None and lon_luna is not None:
-                    elong = (lon_luna - lon_sol) % 360
-                    dist = min(abs(elong - ang_obj), 360 - abs(elong - ang_obj))
-                    
-                    if dist < mejor_dist:
-                        mejor_dist = dist
-                        mejor_fecha = fecha_busqueda
-                        mejor_elong = elong
-                
-                fecha_busqueda += delta_fino
-            
-            # Solo agregar si está dentro del rango de fechas solicitado
-            if inicio <= mejor_fecha <= fin + timedelta(days=1):
-                jd_final = swe.julday(mejor_fecha.year, mejor_fecha.month,
-                                     mejor_fecha.day,
-                                     mejor_fecha.hour + mejor_fecha.minute / 60.0)
-                
-                lon_luna_final = _calc_long(jd_final, swe.MOON)
-                if lon_luna_final is not None:
-                    signo = SIGNOS_NOMBRES[int(lon_luna_final // 30)]
-                    fases.append({
-                        "tipo": "fase_lunar",
-                        "subtipo": nombre,
-                        "descripcion": f"{nombre} en {signo}",
-                        "fecha": mejor_fecha.strftime("%Y-%m-%d %H:%M:%S"),
-                        "signo": signo,
-                        "grado": lon_luna_final % 30,
-                        "planeta": "LUNA",
-                        "_debug_dist": f"{mejor_dist:.3f}°"  # Para verificar precisión
-                    })
-    
-    # Ordenar y filtrar duplicados finales (por si acaso)
+                if not (_desfase(elong_a, ang_obj) < 0 <= _desfase(elong_b, ang_obj)):
+                    continue
+
+                # Bisección sobre el desfase hasta ~1 minuto
+                lo, hi = a, b
+                while hi - lo > tolerancia:
+                    medio = (lo + hi) / 2
+                    elong_m = _elongacion_luna(medio)
+                    if elong_m is None:
+                        break
+                    if _desfase(elong_m, ang_obj) < 0:
+                        lo = medio
+                    else:
+                        hi = medio
+
+                jd_fase = hi
+                lon_luna = _calc_long(jd_fase, swe.MOON)
+                elong_fase = _elongacion_luna(jd_fase)
+                if lon_luna is None or elong_fase is None:
+                    continue
+
+                y, m, d, h = swe.revjul(jd_fase)
+                fecha_fase = datetime(y, m, d) + timedelta(minutes=round(h * 60))
+                signo = SIGNOS_NOMBRES[int(lon_luna // 30)]
+                fases.append({
+                    "tipo": "fase_lunar",
+                    "subtipo": nombre,
+                    "descripcion": f"{nombre} en {signo}",
+                    "fecha": (
+                        f"{fecha_fase.year:04d}-{fecha_fase.month:02d}-{fecha_fase.day:02d} "
+                        f"{fecha_fase.hour:02d}:{fecha_fase.minute:02d}:{fecha_fase.second:02d}"
+                    ),
+                    "signo": signo,
+                    "grado": lon_luna % 30,
+                    "planeta": "LUNA",
+                    "_debug_dist": f"{abs(_desfase(elong_fase, ang_obj)):.3f}°"  # Para verificar precisión
+                })
+
+        a, elong_a = b, elong_b
+
     fases.sort(key=lambda x: x["fecha"])
-    
-    # Eliminar duplicados que estén a menos de 1 hora
-    fases_unicas = []
-    for fase in fases:
-        fecha_fase = datetime.strptime(fase["fecha"], "%Y-%m-%d %H:%M:%S")
-        
-        # Verificar que no haya otra fase del mismo tipo muy cerca
-        duplicado = False
-        for existente in fases_unicas:
-            if existente["subtipo"] == fase["subtipo"]:
-                fecha_existente = datetime.strptime(existente["fecha"], "%Y-%m-%d %H:%M:%S")
-                if abs((fecha_fase - fecha_existente).total_seconds()) < 3600:  # 1 hora
-                    duplicado = True
-                    break
-        
-        if not duplicado:
-            fases_unicas.append(fase)
-    
-    print(f"DEBUG: Encontradas {len(fases_unicas)} fases lunares entre {fecha_inicio} y {fecha_final}")
-    
-    return fases_unicas
+
+    print(f"DEBUG: Encontradas {len(fases)} fases lunares entre {fecha_inicio} y {fecha_final}")
+
+    return fases
+
+@lru_cache(maxsize=4096)
+def _casas_placidus(jd: float, lat: float, lon: float) -> Tuple[Tuple[float, ...], Tuple[float, ...]]:
+    """
+    swe.houses (Placidus) cacheado. La clave llega ya cuantizada
+    (jd a 1e-6 días, lat/lon a 1e-4°) para que peticiones casi iguales coincidan.
+    """
+    cusps, ascmc = swe.houses(jd, lat, lon, b'P')
+    return tuple(cusps[:12]), tuple(ascmc)
 
 # --- NUEVO: Calcular cúspides (casa) desde fecha/hora natal y coordenadas ---
 def calcular_cuspides_desde_natal(year: int, month: int, day: int, hour: int, minute: int,
@@ -793,6 +1034,7 @@ def calcular_cuspides_desde_natal(year: int, month: int, day: int, hour: int, mi
     Devuelve lista de 12 cúspides (grados eclípticos) usando swe.houses.
     IMPORTANTE: Ajusta hora local a UTC antes de calcular.
     """
+    asegurar_ephe_path()
     print(f"🏠 calcular_cuspides_desde_natal() LLAMADA")
     print(f"   Parámetros: {year}-{month}-{day} {hour}:{minute}, lat={lat}, lon={lon}, sistema={sistema}, TZ={zona_horaria}")
     
@@ -810,11 +1052,11 @@ def calcular_cuspides_desde_natal(year: int, month: int, day: int, hour: int, mi
     print(f"   JD calculado: {jd} (UTC: {hora_utc}:{minute})")
     
     try:
-        cusps, ascmc = swe.houses(jd, lat, lon, b'P')  # ⬅️ usar b'P' directo
+        cusps, ascmc = _casas_placidus(round(jd, 6), round(lat, 4), round(lon, 4))  # Placidus (b'P') cacheado
         print(f"   ✅ ASC: {ascmc[0]:.2f}°, MC: {ascmc[1]:.2f}°")
         print(f"   Cúspides: {[f'{c:.2f}°' for c in cusps[:12]]}")
         
-        return [float(c) for c in cusps[:12]]
+        return list(cusps[:12])
     except Exception as e:
         print(f"   ❌ ERROR: {e}")
         import traceback